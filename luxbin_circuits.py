@@ -0,0 +1,91 @@
+"""
+LUXBIN PHASE CIRCUIT BLOCKS
+
+Message-independent gate blocks for each phase (Echo, Relay, Consensus,
+Ping-Pong). They are built once per shape and composed onto an encoded
+circuit instead of being re-appended gate by gate. Needs only Qiskit, so
+the Aer experiment and the IBM hardware runner share the same blocks.
+"""
+
+from functools import lru_cache
+from qiskit import QuantumCircuit
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def echo_tail(n):
+    qc = QuantumCircuit(n, n)
+    for i in range(n - 1):
+        qc.cx(i, i + 1)
+    # Echo response layer
+    for i in range(n):
+        qc.h(i)
+        qc.t(i)
+        qc.h(i)
+    for i in range(n - 1):
+        qc.cx(i, i + 1)
+    qc.measure(range(n), range(n))
+    return qc
+
+
+@lru_cache(maxsize=None)
+def relay_tail(n, leg):
+    qc = QuantumCircuit(n, n)
+    if leg == 1:
+        # Phase shifts + pairwise entanglement
+        for i in range(n):
+            qc.rz(np.pi / 4, i)
+            qc.rx(np.pi / 6, i)  # Microwave kick
+        for i in range(0, n - 1, 2):
+            qc.cx(i, i + 1)
+    elif leg == 2:
+        # Swap + rotate + microwave flip
+        for i in range(n - 1):
+            qc.swap(i, i + 1)
+        for i in range(n):
+            qc.ry(np.pi / 3, i)
+            qc.rx(np.pi / 4, i)  # Microwave modulation
+    elif leg == 3:
+        # Loop entangle + interference + microwave resonance
+        for i in range(n - 1):
+            qc.cx(i, i + 1)
+        qc.cx(n - 1, 0)
+        for i in range(n):
+            qc.h(i)
+            qc.rx(np.pi / 3, i)  # Microwave resonance sweep
+    for i in range(n):
+        qc.h(i)
+    qc.measure(range(n), range(n))
+    return qc
+
+
+@lru_cache(maxsize=None)
+def consensus_tail(n):
+    qc = QuantumCircuit(n, n)
+    # GHZ-like entanglement
+    for i in range(n - 1):
+        qc.cx(i, i + 1)
+    # Agreement phase + microwave sync
+    for i in range(n):
+        qc.rz(np.pi / n, i)
+        qc.rx(np.pi / (n + 1), i)  # Microwave consensus sync
+    for i in range(n):
+        qc.h(i)
+    qc.measure(range(n), range(n))
+    return qc
+
+
+@lru_cache(maxsize=None)
+def ping_tail(n, is_pong):
+    qc = QuantumCircuit(n, n)
+    if is_pong:
+        for i in range(n - 1, 0, -1):
+            qc.cx(i, i - 1)
+    else:
+        for i in range(n - 1):
+            qc.cx(i, i + 1)
+    for i in range(n):
+        qc.t(i)
+        qc.h(i)
+    qc.measure(range(n), range(n))
+    return qc
@@ -0,0 +1,219 @@
+"""
+LUXBIN TRIPLE ENCODING
+
+Character tables for the three channels (Light, Sound, Microwave), the
+rotation angles they map to, and triple-channel decoding of measurement
+counts. Shared by the IBM hardware scripts, the full experiment and the
+standalone echo loop, relay, consensus and ping-pong modules.
+"""
+
+from bisect import bisect_right
+import heapq
+from operator import itemgetter
+import numpy as np
+import os
+try:
+    from numba import njit
+except ImportError:  # optional; decoding falls back to NumPy broadcasting
+    njit = None
+
+# Console art, spectra and per-round breakdowns in the scripts; set
+# LUXBIN_VERBOSE=0 to keep only their logs (e.g. for benchmark runs)
+VERBOSE = os.environ.get('LUXBIN_VERBOSE', '1') == '1'
+
+# ==========================================================================
+# CHARACTER TABLES
+# ==========================================================================
+
+CHAR_WAVELENGTHS = {
+    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
+    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
+    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
+    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
+    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
+    'Z': 497.4, ' ': 540.3,
+}
+
+CHAR_FREQUENCIES = {
+    'A': 440.0, 'B': 493.9, 'C': 523.3, 'D': 587.3, 'E': 659.3,
+    'F': 698.5, 'G': 784.0, 'H': 830.6, 'I': 880.0, 'J': 932.3,
+    'K': 987.8, 'L': 1046.5, 'M': 1108.7, 'N': 1174.7, 'O': 1244.5,
+    'P': 1318.5, 'Q': 1396.9, 'R': 1480.0, 'S': 1568.0, 'T': 1661.2,
+    'U': 1760.0, 'V': 1864.7, 'W': 1975.5, 'X': 2093.0, 'Y': 2217.5,
+    'Z': 2349.3, ' ': 262.6,
+}
+
+CHAR_MICROWAVES = {
+    'A': 4.000, 'B': 4.154, 'C': 4.308, 'D': 4.462, 'E': 4.615,
+    'F': 4.769, 'G': 4.923, 'H': 5.077, 'I': 5.231, 'J': 5.385,
+    'K': 5.538, 'L': 5.692, 'M': 5.846, 'N': 6.000, 'O': 6.154,
+    'P': 6.308, 'Q': 6.462, 'R': 6.615, 'S': 6.769, 'T': 6.923,
+    'U': 7.077, 'V': 7.231, 'W': 7.385, 'X': 7.538, 'Y': 7.692,
+    'Z': 7.846, ' ': 5.500,
+}
+
+MW_MIN, MW_MAX = 4.0, 8.0
+
+# Paired key/value arrays for vectorized nearest-neighbour decoding
+WL_KEYS = np.array(list(CHAR_WAVELENGTHS.keys()))
+WL_VALS = np.array(list(CHAR_WAVELENGTHS.values()), dtype=np.float64)
+FREQ_KEYS = np.array(list(CHAR_FREQUENCIES.keys()))
+FREQ_VALS = np.array(list(CHAR_FREQUENCIES.values()), dtype=np.float64)
+MW_KEYS = np.array(list(CHAR_MICROWAVES.keys()))
+MW_VALS = np.array(list(CHAR_MICROWAVES.values()), dtype=np.float64)
+
+# 128-entry ASCII tables for averaging a message's channel values; characters
+# outside the LUXBIN alphabet read the summary defaults
+WL_LUT = np.full(128, 540.0)
+FREQ_LUT = np.full(128, 262.6)
+MW_LUT = np.full(128, 5.5)
+for _char in CHAR_WAVELENGTHS:
+    WL_LUT[ord(_char)] = CHAR_WAVELENGTHS[_char]
+    FREQ_LUT[ord(_char)] = CHAR_FREQUENCIES[_char]
+    MW_LUT[ord(_char)] = CHAR_MICROWAVES[_char]
+
+def ascii_codes(message, n=5):
+    """LUT indices for the first n characters (non-ASCII reads as '?')."""
+    return np.frombuffer(message[:n].encode('ascii', 'replace').upper(), dtype=np.uint8)
+
+# Circuits here are at most 5 qubits, so every measured bitstring is one of
+# these 62 keys (widths 1-5 never collide); a dict hit beats int(s, 2)
+BIT_TO_INT = {format(i, f'0{w}b'): i for w in range(1, 6) for i in range(2 ** w)}
+
+
+if njit is not None:
+    @njit(cache=True)
+    def nearest_index(vals, xs):
+        """Index of the closest entry in vals for every value in xs.
+
+        Plain loops compile tighter than the broadcast for a 27-entry table;
+        strict < keeps argmin's first-match tie-breaking.
+        """
+        out = np.empty(xs.shape[0], dtype=np.int64)
+        for j in range(xs.shape[0]):
+            best, best_d = 0, abs(vals[0] - xs[j])
+            for i in range(1, vals.shape[0]):
+                d = abs(vals[i] - xs[j])
+                if d < best_d:
+                    best, best_d = i, d
+            out[j] = best
+        return out
+else:
+    def nearest_index(vals, xs):
+        """Index of the closest entry in vals for every value in xs."""
+        return np.abs(vals[:, None] - xs[None, :]).argmin(axis=0)
+
+
+def nearest_chars(keys, vals, xs):
+    """Nearest character for every value in xs."""
+    return keys[nearest_index(vals, xs)]
+
+def wavelength_to_char(wl):
+    return str(WL_KEYS[np.abs(WL_VALS - wl).argmin()])
+
+def frequency_to_char(freq):
+    return str(FREQ_KEYS[np.abs(FREQ_VALS - freq).argmin()])
+
+def microwave_to_char(mw):
+    return str(MW_KEYS[np.abs(MW_VALS - mw).argmin()])
+
+# Band edges are exclusive upper bounds, so bisect_right picks the label
+COLOR_EDGES = [440, 490, 510, 565, 590, 625]
+COLOR_NAMES = ["Violet", "Blue", "Cyan", "Green", "Yellow", "Orange", "Red"]
+NOTE_EDGES = [300, 500, 700, 1000, 1500, 2000]
+NOTE_NAMES = ["C4", "A4-B4", "D5-E5", "G5-B5", "C6-F6", "G6-B6", "C7+"]
+MW_EDGES = [5.0, 6.0, 7.0]
+MW_BANDS = ["C-band", "C/X", "X-lo", "X-hi"]
+
+def color_name(wl):
+    return COLOR_NAMES[bisect_right(COLOR_EDGES, wl)]
+
+def note_name(freq):
+    return NOTE_NAMES[bisect_right(NOTE_EDGES, freq)]
+
+def mw_band(ghz):
+    return MW_BANDS[bisect_right(MW_EDGES, ghz)]
+
+# Spectrum bar padding by column, indexed up to 63 (plots are at most 55 wide)
+SPACES = [" " * i for i in range(64)]
+
+
+def decode_counts(counts, n_chars=5, num_bits=None):
+    """Decode quantum measurement using triple-channel consensus.
+
+    counts is keyed by bitstring, or by integer outcome (Aer int_outcomes(),
+    SamplerV2 get_int_counts()) when the register width is given as num_bits.
+    """
+    top = heapq.nlargest(n_chars, counts.items(), key=itemgetter(1))
+
+    # All bitstrings share the register width, so the ratio -> channel
+    # mapping is done for the whole top-N at once
+    if num_bits is None:
+        values = np.fromiter((BIT_TO_INT[bitstring] if bitstring in BIT_TO_INT else int(bitstring, 2)
+                              for bitstring, _ in top), dtype=np.int64, count=len(top))
+        max_val = 2 ** len(top[0][0]) - 1 if top else 0
+    else:
+        values = np.fromiter((value for value, _ in top), dtype=np.int64, count=len(top))
+        max_val = 2 ** num_bits - 1
+    ratios = values / max_val if max_val > 0 else np.full(len(top), 0.5)
+    light_wls = 400 + ratios * 300
+    sound_freqs = 262.6 + ratios * (2349.3 - 262.6)
+    mw_ghzs = MW_MIN + ratios * (MW_MAX - MW_MIN)
+
+    # One argmin per channel over all chars, then 2-of-3 vote (light breaks ties)
+    light = nearest_chars(WL_KEYS, WL_VALS, light_wls)
+    sound = nearest_chars(FREQ_KEYS, FREQ_VALS, sound_freqs)
+    mw = nearest_chars(MW_KEYS, MW_VALS, mw_ghzs)
+    chars = np.where((light == sound) | (light == mw), light,
+                     np.where(sound == mw, sound, light))
+
+    return ''.join(chars), light_wls, sound_freqs, mw_ghzs
+
+
+# ==========================================================================
+# ROTATION ANGLES
+# ==========================================================================
+
+# Angle arrays are indexed by table position (A-Z -> 0-25, space -> 26);
+# unknown characters fall back to the space entry.
+CHAR_INDEX = {c: i for i, c in enumerate(CHAR_WAVELENGTHS)}
+
+def char_to_idx(char):
+    return CHAR_INDEX.get(char.upper(), 26)
+
+# RY light, RZ sound, RX microwave (the *_VALS arrays share table order)
+THETA_LIGHT = ((WL_VALS - 400) / 300) * 2 * np.pi
+THETA_SOUND = ((FREQ_VALS - 262.6) / (2349.3 - 262.6)) * np.pi
+THETA_MW = ((MW_VALS - MW_MIN) / (MW_MAX - MW_MIN)) * np.pi
+
+# Ping-pong uses half-range light and halved sound/microwave angles
+PING_THETA = ((WL_VALS - 400) / 300) * np.pi
+PING_PHI = ((FREQ_VALS - 262.6) / (2349.3 - 262.6)) * np.pi / 2
+PING_GAMMA = ((MW_VALS - MW_MIN) / (MW_MAX - MW_MIN)) * np.pi / 2
+
+# 128-entry ASCII versions of the light angles, gathered per message by the
+# ping-pong (half-turn) and relay (full-turn) templates
+ASCII_INDEX = np.full(128, CHAR_INDEX[' '])
+for _char, _i in CHAR_INDEX.items():
+    ASCII_INDEX[ord(_char)] = _i
+THETA_LIGHT_LUT = THETA_LIGHT[ASCII_INDEX]
+PING_THETA_LUT = PING_THETA[ASCII_INDEX]
+
+# Per-character (light, sound, mw) triples for the hardware templates
+CHAR_ANGLES = {c: (THETA_LIGHT[i], THETA_SOUND[i], THETA_MW[i]) for c, i in CHAR_INDEX.items()}
+DEFAULT_ANGLES = CHAR_ANGLES[' ']
+CHAR_PING_ANGLES = {c: (PING_THETA[i], PING_PHI[i], PING_GAMMA[i]) for c, i in CHAR_INDEX.items()}
+DEFAULT_PING_ANGLES = CHAR_PING_ANGLES[' ']
+
+# Ping flips the sound angle and pong flips light and microwave
+PING_SIGNS = np.array([1.0, -1.0, 1.0])
+PONG_SIGNS = np.array([-1.0, 1.0, -1.0])
+
+
+def message_angles(message, n):
+    return np.array([CHAR_ANGLES.get(c.upper(), DEFAULT_ANGLES) for c in message[:n]]).ravel()
+
+
+def ping_angles(message, n, is_pong):
+    angles = np.array([CHAR_PING_ANGLES.get(c.upper(), DEFAULT_PING_ANGLES) for c in message[:n]])
+    return (angles * (PONG_SIGNS if is_pong else PING_SIGNS)).ravel()
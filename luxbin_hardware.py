@@ -0,0 +1,237 @@
+"""
+LUXBIN IBM HARDWARE RUNNER
+
+Parameterized phase circuits (Echo, Relay, Consensus, Ping-Pong), their
+per-backend transpilation, and job submission through SamplerV2. Shared by
+luxbin_ibm_live.py and luxbin_persistent_loop.py; the standalone relay and
+ping-pong scripts reuse its pass managers.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
+from qiskit_ibm_runtime import SamplerV2
+from qiskit.circuit.equivalence_library import SessionEquivalenceLibrary
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+from qiskit.transpiler.passes import (
+    SetLayout, FullAncillaAllocation, EnlargeWithAncilla, ApplyLayout,
+    SabreSwap, BasisTranslator, GateDirection,
+)
+
+from luxbin_circuits import echo_tail, relay_tail, consensus_tail, ping_tail
+from luxbin_encoding import message_angles, ping_angles
+
+# ==========================================================================
+# CIRCUIT TEMPLATES
+# ==========================================================================
+
+# Every phase circuit is H + RY/RZ/RX on each qubit followed by one of the
+# fixed luxbin_circuits blocks, so each (kind, n, leg/pong) shape is built
+# once with parameters and a message only supplies the 3n angle values.
+ANGLES = ParameterVector('θ', 15)
+TAILS = {'echo': echo_tail, 'relay': relay_tail,
+         'consensus': consensus_tail, 'ping': ping_tail}
+
+
+@lru_cache(maxsize=None)
+def circuit_template(kind, n, *variant):
+    qc = QuantumCircuit(n, n)
+    for i in range(n):
+        qc.h(i)
+        qc.ry(ANGLES[3 * i], i); qc.rz(ANGLES[3 * i + 1], i); qc.rx(ANGLES[3 * i + 2], i)
+    qc.compose(TAILS[kind](n, *variant), inplace=True, copy=False)
+    return qc
+
+
+# ==========================================================================
+# TRANSPILE + SUBMIT
+# ==========================================================================
+
+def select_qubits(backend, n=5):
+    """Pick the chain of n linked physical qubits with the lowest summed
+    two-qubit and readout error, using the backend's calibrated Target.
+
+    Every circuit here entangles neighbouring qubits, so on a chain only
+    relay leg 3's ring-closing CX needs routing. Returns None when the
+    target has no cz/ecr/cx gate or no n linked qubits.
+    """
+    target = backend.target
+    two_q = next((op for op in ('cz', 'ecr', 'cx') if op in target.operation_names), None)
+    if two_q is None:
+        return None
+
+    def error(op, qargs):
+        props = target[op].get(qargs)
+        return props.error if props is not None and props.error is not None else 1.0
+
+    readout = [error('measure', (q,)) for q in range(target.num_qubits)]
+    links = {}
+    for a, b in target[two_q]:
+        e = error(two_q, (a, b))
+        for x, y in ((a, b), (b, a)):
+            row = links.setdefault(x, {})
+            row[y] = min(e, row.get(y, 1.0))
+
+    best_cost, best_chain = float('inf'), None
+
+    def extend(chain, cost):
+        nonlocal best_cost, best_chain
+        if cost >= best_cost:
+            return
+        if len(chain) == n:
+            best_cost, best_chain = cost, chain
+            return
+        for q, e in links.get(chain[-1], {}).items():
+            if q not in chain:
+                extend(chain + [q], cost + e + readout[q])
+
+    for q in range(target.num_qubits):
+        extend([q], readout[q])
+    return best_chain
+
+
+_QUBIT_CHAINS = {}
+_PM_CACHE = {}
+_SAMPLERS = {}
+
+
+def get_pass_manager(backend, n):
+    """Layout + route + translate pass manager for an n-qubit circuit.
+
+    The circuits are at most 5 qubits, so rather than running the preset
+    layout search and optimization loop over the whole device, pin them to
+    a pre-selected chain and only do what the hardware requires. Backends
+    without such a chain get the preset pass manager instead.
+    """
+    key = (backend.name, n)
+    if key in _PM_CACHE:
+        return _PM_CACHE[key]
+    if backend.name not in _QUBIT_CHAINS:
+        _QUBIT_CHAINS[backend.name] = select_qubits(backend)
+    if _QUBIT_CHAINS[backend.name] is None:
+        _PM_CACHE[key] = generate_preset_pass_manager(backend=backend, optimization_level=1)
+    else:
+        target = backend.target
+        cmap = target.build_coupling_map()
+        basis = list(target.operation_names)
+        _PM_CACHE[key] = PassManager([
+            SetLayout(_QUBIT_CHAINS[backend.name][:n]),
+            FullAncillaAllocation(cmap),
+            EnlargeWithAncilla(),
+            ApplyLayout(),
+            SabreSwap(cmap, heuristic='basic', seed=0, trials=1),
+            BasisTranslator(SessionEquivalenceLibrary, basis, target),
+            GateDirection(cmap, target),
+            BasisTranslator(SessionEquivalenceLibrary, basis, target),
+        ])
+    return _PM_CACHE[key]
+
+
+@lru_cache(maxsize=None)
+def transpiled_template(backend, kind, n, *variant):
+    """circuit_template transpiled for backend. Done once per shape; after
+    that a message costs only its parameter values."""
+    return get_pass_manager(backend, n).run(circuit_template(kind, n, *variant))
+
+
+def calibration_time(backend):
+    """When the calibration behind backend.target was taken, or None for
+    backends that do not report one."""
+    properties = getattr(backend, 'properties', None)
+    return getattr(properties() if properties else None, 'last_update_date', None)
+
+
+def refresh_calibration(backend):
+    """Re-fetch backend's calibration. If it changed, the qubit chain picked
+    from the old error rates and the pass managers and templates built on
+    it are dropped, to be rebuilt on next use. Returns True in that case.
+
+    Not thread-safe; call it between rounds of jobs, not while templates
+    are being prefetched.
+    """
+    before = calibration_time(backend)
+    backend.refresh()
+    if calibration_time(backend) == before:
+        return False
+    _QUBIT_CHAINS.pop(backend.name, None)
+    for key in [key for key in _PM_CACHE if key[0] == backend.name]:
+        del _PM_CACHE[key]
+    transpiled_template.cache_clear()
+    return True
+
+
+def echo_pub(backend, message):
+    n = min(len(message), 5)
+    return transpiled_template(backend, 'echo', n), message_angles(message, n)
+
+
+def relay_pub(backend, message, leg):
+    n = min(len(message), 5)
+    return transpiled_template(backend, 'relay', n, leg), message_angles(message, n)
+
+
+def consensus_pub(backend, message):
+    return transpiled_template(backend, 'consensus', 5), message_angles((message + 'AAAAA')[:5], 5)
+
+
+def ping_pub(backend, message, is_pong=False):
+    n = min(len(message), 5)
+    return transpiled_template(backend, 'ping', n, is_pong), ping_angles(message, n, is_pong)
+
+
+# Echo, relay and ping-pong decodes rank only the top 5 of at most 32
+# outcomes, which 128 shots resolve; raise this if a backend's decoded
+# messages get noisy
+SHOTS = 128
+
+# A consensus vote is a backend's single most frequent outcome, so close
+# runners-up decide it and each vote keeps the larger sample
+VOTE_SHOTS = 1000
+
+
+def submit_to_hardware(backend, pubs, shots=SHOTS, verbose=False):
+    """Submit (transpiled template, parameter values) PUBs as one SamplerV2
+    job without waiting, so circuits bound for the same backend share a
+    single queue slot."""
+    if backend.name not in _SAMPLERS:
+        _SAMPLERS[backend.name] = SamplerV2(backend)
+    sampler = _SAMPLERS[backend.name]
+    job = sampler.run(pubs, shots=shots)
+    if verbose:
+        job_id = job.job_id()
+        print(f"    Job submitted: {job_id}")
+        print(f"    View at: https://quantum.ibm.com/jobs/{job_id}")
+    return job
+
+
+def collect_counts(job):
+    """Block until a submitted job finishes. Returns counts for each PUB."""
+    result = job.result()
+    return [pub.data.c.get_counts() for pub in result]
+
+
+def run_on_hardware(backend, pub, shots=SHOTS, verbose=False):
+    """Run one PUB on real IBM hardware. Returns counts and job_id."""
+    job = submit_to_hardware(backend, [pub], shots=shots, verbose=verbose)
+    return collect_counts(job)[0], job.job_id()
+
+
+def least_busy(backends, fallback):
+    """Backend with the fewest pending jobs; fallback if status is unavailable."""
+    try:
+        return min(backends, key=lambda b: b.status().pending_jobs)
+    except Exception:
+        return fallback
+
+
+@dataclass(slots=True)
+class LogEntry:
+    """One phase of a pipeline run."""
+    phase: str
+    msg_in: str
+    msg_out: str
+    node: str
+    job: str
+    time: float
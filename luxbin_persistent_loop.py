@@ -7,155 +7,42 @@ all 3 IBM quantum computers in the Echo -> Relay -> Consensus -> Ping-Pong loop.
 
 Triple encoding: Light (RY) + Sound (RZ) + Microwave (RX)
 
-Logs all results to luxbin_loop_log.json
+Logs all results to luxbin_loop_log.ndjson (one JSON object per loop)
 Run with: nohup python3 luxbin_persistent_loop.py &
 """
 
-from qiskit import QuantumCircuit
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2
-from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
-import concurrent.futures
-import numpy as np
+from qiskit_ibm_runtime import QiskitRuntimeService
 import time
 import json
 import os
 import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from collections import Counter
+
+from luxbin_encoding import BIT_TO_INT, decode_counts, wavelength_to_char
+from luxbin_hardware import (
+    transpiled_template, echo_pub, relay_pub, consensus_pub, ping_pub,
+    submit_to_hardware, collect_counts, run_on_hardware, least_busy, VOTE_SHOTS,
+    refresh_calibration,
+)
 
 TOKEN = os.environ.get('IBM_QUANTUM_TOKEN', 'YOUR_IBM_QUANTUM_TOKEN')
-LOG_FILE = '/tmp/luxbin-quantum-internet/luxbin_loop_log.json'
+LOG_FILE = '/tmp/luxbin-quantum-internet/luxbin_loop_log.ndjson'
 STATUS_FILE = '/tmp/luxbin-quantum-internet/luxbin_loop_status.txt'
 
-# LUXBIN TRIPLE ENCODING
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
-CHAR_FREQUENCIES = {
-    'A': 440.0, 'B': 493.9, 'C': 523.3, 'D': 587.3, 'E': 659.3,
-    'F': 698.5, 'G': 784.0, 'H': 830.6, 'I': 880.0, 'J': 932.3,
-    'K': 987.8, 'L': 1046.5, 'M': 1108.7, 'N': 1174.7, 'O': 1244.5,
-    'P': 1318.5, 'Q': 1396.9, 'R': 1480.0, 'S': 1568.0, 'T': 1661.2,
-    'U': 1760.0, 'V': 1864.7, 'W': 1975.5, 'X': 2093.0, 'Y': 2217.5,
-    'Z': 2349.3, ' ': 262.6,
-}
-CHAR_MICROWAVES = {
-    'A': 4.000, 'B': 4.154, 'C': 4.308, 'D': 4.462, 'E': 4.615,
-    'F': 4.769, 'G': 4.923, 'H': 5.077, 'I': 5.231, 'J': 5.385,
-    'K': 5.538, 'L': 5.692, 'M': 5.846, 'N': 6.000, 'O': 6.154,
-    'P': 6.308, 'Q': 6.462, 'R': 6.615, 'S': 6.769, 'T': 6.923,
-    'U': 7.077, 'V': 7.231, 'W': 7.385, 'X': 7.538, 'Y': 7.692,
-    'Z': 7.846, ' ': 5.500,
-}
-MW_MIN, MW_MAX = 4.0, 8.0
-
-def wavelength_to_char(wl):
-    return min(CHAR_WAVELENGTHS.items(), key=lambda x: abs(x[1] - wl))[0]
-def frequency_to_char(freq):
-    return min(CHAR_FREQUENCIES.items(), key=lambda x: abs(x[1] - freq))[0]
-def microwave_to_char(mw):
-    return min(CHAR_MICROWAVES.items(), key=lambda x: abs(x[1] - mw))[0]
-
-def decode_counts(counts, n_chars=5):
-    sorted_counts = sorted(counts.items(), key=lambda x: -x[1])
-    chars, wls, freqs, mws = [], [], [], []
-    for bitstring, count in sorted_counts[:n_chars]:
-        value = int(bitstring, 2)
-        max_val = 2 ** len(bitstring) - 1
-        ratio = value / max_val if max_val > 0 else 0.5
-        wl = 400 + ratio * 300
-        freq = 262.6 + ratio * (2349.3 - 262.6)
-        mw = MW_MIN + ratio * (MW_MAX - MW_MIN)
-        votes = [wavelength_to_char(wl), frequency_to_char(freq), microwave_to_char(mw)]
-        winner = Counter(votes).most_common(1)[0]
-        chars.append(winner[0] if winner[1] >= 2 else votes[0])
-        wls.append(wl); freqs.append(freq); mws.append(mw)
-    return ''.join(chars), wls, freqs, mws
-
-def encode_char(qc, i, char):
-    wl = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-    freq = CHAR_FREQUENCIES.get(char.upper(), 262.6)
-    mw = CHAR_MICROWAVES.get(char.upper(), 5.5)
-    qc.ry(((wl - 400) / 300) * 2 * np.pi, i)
-    qc.rz(((freq - 262.6) / (2349.3 - 262.6)) * np.pi, i)
-    qc.rx(((mw - MW_MIN) / (MW_MAX - MW_MIN)) * np.pi, i)
-
-def build_echo(msg):
-    n = min(len(msg), 5)
-    qc = QuantumCircuit(n, n)
-    for i, c in enumerate(msg[:n]):
-        qc.h(i); encode_char(qc, i, c)
-    for i in range(n-1): qc.cx(i, i+1)
-    for i in range(n): qc.h(i); qc.t(i); qc.h(i)
-    for i in range(n-1): qc.cx(i, i+1)
-    qc.measure(range(n), range(n))
-    return qc
-
-def build_relay(msg, leg):
-    n = min(len(msg), 5)
-    qc = QuantumCircuit(n, n)
-    for i, c in enumerate(msg[:n]):
-        qc.h(i); encode_char(qc, i, c)
-    if leg == 1:
-        for i in range(n): qc.rz(np.pi/4, i); qc.rx(np.pi/6, i)
-        for i in range(0, n-1, 2): qc.cx(i, i+1)
-    elif leg == 2:
-        for i in range(n-1): qc.swap(i, i+1)
-        for i in range(n): qc.ry(np.pi/3, i); qc.rx(np.pi/4, i)
-    elif leg == 3:
-        for i in range(n-1): qc.cx(i, i+1)
-        qc.cx(n-1, 0)
-        for i in range(n): qc.h(i); qc.rx(np.pi/3, i)
-    for i in range(n): qc.h(i)
-    qc.measure(range(n), range(n))
-    return qc
-
-def build_consensus(msg):
-    n = 5; msg = (msg + 'AAAAA')[:5]
-    qc = QuantumCircuit(n, n)
-    for i, c in enumerate(msg):
-        qc.h(i); encode_char(qc, i, c)
-    for i in range(n-1): qc.cx(i, i+1)
-    for i in range(n): qc.rz(np.pi/n, i); qc.rx(np.pi/(n+1), i)
-    for i in range(n): qc.h(i)
-    qc.measure(range(n), range(n))
-    return qc
-
-def build_ping(msg, is_pong=False):
-    n = min(len(msg), 5)
-    qc = QuantumCircuit(n, n)
-    for i, c in enumerate(msg[:n]):
-        wl = CHAR_WAVELENGTHS.get(c.upper(), 540.3)
-        freq = CHAR_FREQUENCIES.get(c.upper(), 262.6)
-        mw = CHAR_MICROWAVES.get(c.upper(), 5.5)
-        t = ((wl-400)/300)*np.pi; p = ((freq-262.6)/(2349.3-262.6))*np.pi/2
-        g = ((mw-MW_MIN)/(MW_MAX-MW_MIN))*np.pi/2
-        qc.h(i)
-        if is_pong: qc.ry(-t,i); qc.rz(p,i); qc.rx(-g,i)
-        else: qc.ry(t,i); qc.rz(-p,i); qc.rx(g,i)
-    if is_pong:
-        for i in range(n-1, 0, -1): qc.cx(i, i-1)
-    else:
-        for i in range(n-1): qc.cx(i, i+1)
-    for i in range(n): qc.t(i); qc.h(i)
-    qc.measure(range(n), range(n))
-    return qc
-
-def run_hw(backend, qc, shots=500):
-    pm = generate_preset_pass_manager(backend=backend, optimization_level=1)
-    transpiled = pm.run(qc)
-    sampler = SamplerV2(backend)
-    job = sampler.run([transpiled], shots=shots)
-    job_id = job.job_id()
-    result = job.result()
-    counts = result[0].data.c.get_counts()
-    return counts, job_id
+# One worker pool for the life of the process: backend warm-up and job
+# submission from every phase go through it instead of per-loop threads.
+EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+def prefetch(backend, kind, n, *variant):
+    """Transpile the next phase's template in the background while the
+    current job is queued."""
+    return EXECUTOR.submit(transpiled_template, backend, kind, n, *variant)
+
+def submit_vote(backend, message):
+    """Transpile and submit one backend's consensus vote on message."""
+    return submit_to_hardware(backend, [consensus_pub(backend, message)], VOTE_SHOTS)
 
 def log(msg):
     ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -165,17 +52,9 @@ def log(msg):
         f.write(line + '\n')
 
 def save_loop_result(loop_num, data):
-    """Append result to JSON log file."""
-    results = []
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, 'r') as f:
-                results = json.load(f)
-        except:
-            results = []
-    results.append(data)
-    with open(LOG_FILE, 'w') as f:
-        json.dump(results, f, indent=2)
+    """Append result as one line of the NDJSON log file."""
+    with open(LOG_FILE, 'a') as f:
+        f.write(json.dumps(data) + '\n')
 
 # ==========================================================================
 # GRACEFUL SHUTDOWN
@@ -221,20 +100,30 @@ while running:
     log(f"{'='*60}")
 
     try:
+        # Pick up new calibrations, so jobs stay on each backend's best qubits
+        for backend in (backend_a, backend_b, backend_c):
+            if refresh_calibration(backend):
+                log(f"  {backend.name} recalibrated; re-selecting qubits")
+
         # ECHO
         log(f"  ECHO [{backend_a.name}]: '{current}'")
-        qc = build_echo(current)
-        counts, jid = run_hw(backend_a, qc, 200)
+        counts, jid = run_on_hardware(backend_a, echo_pub(backend_a, current))
         response, wls, freqs, mws = decode_counts(counts)
         jobs_this_loop.append(jid)
         log(f"    -> '{response}' [job:{jid}]")
         current = response
 
-        # RELAY
-        for leg, backend in enumerate([backend_a, backend_b, backend_c], 1):
+        # RELAY - legs are chained; prep the next leg's backend while one is queued
+        relay_backends = [backend_a, backend_b, backend_c]
+        warm = None
+        for leg, backend in enumerate(relay_backends, 1):
             log(f"  RELAY Leg {leg} [{backend.name}]: '{current}'")
-            qc = build_relay(current, leg)
-            counts, jid = run_hw(backend, qc, 500)
+            if warm is not None:
+                warm.result()
+            job = submit_to_hardware(backend, [relay_pub(backend, current, leg)])
+            if leg < 3:
+                warm = prefetch(relay_backends[leg], 'relay', min(len(current), 5), leg + 1)
+            counts, jid = collect_counts(job)[0], job.job_id()
             response, wls, freqs, mws = decode_counts(counts)
             jobs_this_loop.append(jid)
             log(f"    -> '{response}' [job:{jid}]")
@@ -243,45 +132,42 @@ while running:
         # CONSENSUS
         log(f"  CONSENSUS: '{current}'")
         votes = []
-        def do_vote(backend, msg):
-            qc = build_consensus(msg)
-            counts, jid = run_hw(backend, qc, 1000)
-            top = max(counts.items(), key=lambda x: x[1])[0]
-            val = int(top, 2)
-            ratio = val / 31
-            return wavelength_to_char(400 + ratio * 300), jid
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as ex:
-            futs = [ex.submit(do_vote, b, current) for b in [backend_a, backend_b, backend_c]]
-            for f in concurrent.futures.as_completed(futs):
-                char, jid = f.result()
-                votes.append(char)
-                jobs_this_loop.append(jid)
+        # All three votes are submitted concurrently before we block on any of them
+        vote_jobs = [EXECUTOR.submit(submit_vote, b, current) for b in [backend_a, backend_b, backend_c]]
+        for job in (f.result() for f in vote_jobs):
+            counts = collect_counts(job)[0]
+            top = max(counts, key=counts.get)
+            ratio = BIT_TO_INT[top] / 31
+            votes.append(wavelength_to_char(400 + ratio * 300))
+            jobs_this_loop.append(job.job_id())
 
         majority = max(set(votes), key=votes.count)
         consensus = ''.join(votes)
-        while len(consensus) < 5:
-            consensus += majority
-        current = consensus[:5]
+        current = consensus.ljust(5, majority)[:5]
         log(f"    -> '{current}' (votes: {votes})")
 
-        # PING-PONG
+        # PING-PONG - the pong backend is prepped while the ping is queued
+        warm = None
         for rally in range(2):
             is_pong = rally % 2 == 1
             backend = [backend_a, backend_b][rally % 2]
             action = "PONG" if is_pong else "PING"
             log(f"  PING-PONG {action} [{backend.name}]: '{current}'")
-            qc = build_ping(current, is_pong)
-            counts, jid = run_hw(backend, qc, 500)
+            if warm is not None:
+                warm.result()
+            job = submit_to_hardware(backend, [ping_pub(backend, current, is_pong)])
+            if not is_pong:
+                warm = prefetch(backend_b, 'ping', min(len(current), 5), True)
+            counts, jid = collect_counts(job)[0], job.job_id()
             response, wls, freqs, mws = decode_counts(counts)
             jobs_this_loop.append(jid)
             log(f"    -> '{response}' [job:{jid}]")
             current = response
 
-        # FINAL ECHO (loops back - output becomes next loop's input)
-        log(f"  ECHO FINAL [{backend_a.name}]: '{current}'")
-        qc = build_echo(current)
-        counts, jid = run_hw(backend_a, qc, 200)
+        # FINAL ECHO (loops back - output becomes next loop's input), on the shortest queue
+        final_backend = least_busy([backend_a, backend_b, backend_c], backend_a)
+        log(f"  ECHO FINAL [{final_backend.name}]: '{current}'")
+        counts, jid = run_on_hardware(final_backend, echo_pub(final_backend, current))
         response, wls, freqs, mws = decode_counts(counts)
         jobs_this_loop.append(jid)
         log(f"    -> '{response}' [job:{jid}]")
@@ -321,6 +207,7 @@ while running:
         # Reset to NICHE on error
         current = "NICHE"
 
+EXECUTOR.shutdown(wait=False, cancel_futures=True)
 log(f"\n{'='*60}")
 log(f"LOOP STOPPED after {loop_num} loops, {total_jobs} total IBM jobs")
 log(f"{'='*60}")
@@ -12,45 +12,40 @@ This tests whether the computers can reach "quantum consensus"!
 """
 
 from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
 from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2
 from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
 import concurrent.futures
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 import numpy as np
 import time
 import os
 
+from luxbin_encoding import THETA_LIGHT, char_to_idx, wavelength_to_char
+
 TOKEN = os.environ.get('IBM_QUANTUM_TOKEN', 'YOUR_IBM_QUANTUM_TOKEN')
 
-# LUXBIN
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
-
-def wavelength_to_char(wavelength):
-    closest = min(CHAR_WAVELENGTHS.items(), key=lambda x: abs(x[1] - wavelength))
-    return closest[0]
-
-def create_consensus_circuit(seed_message: str):
+# One RY angle per proposal character; elements sort by index, so a
+# proposal's angle values bind positionally
+THETAS = ParameterVector('θ', 5)
+
+def create_consensus_circuit(n_encoded: int):
     """
     Create identical circuit for all computers.
 
-    The circuit encodes a "proposal" that all computers vote on.
+    The circuit encodes a "proposal" that all computers vote on. The proposal
+    angles are parameters (one per encoded character), so the circuit is
+    transpiled once per backend and bound per proposal.
     """
     n_qubits = 5
     qc = QuantumCircuit(n_qubits, n_qubits)
 
     # Encode seed message as the "proposal"
-    for i, char in enumerate(seed_message[:n_qubits]):
-        wavelength = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-        theta = ((wavelength - 400) / 300) * np.pi
-
+    for i in range(n_encoded):
         qc.h(i)
-        qc.ry(theta, i)
+        qc.ry(THETAS[i], i)
 
     # Create GHZ-like state (all qubits correlated)
     for i in range(n_qubits - 1):
@@ -67,39 +62,52 @@ def create_consensus_circuit(seed_message: str):
     qc.measure(range(n_qubits), range(n_qubits))
     return qc
 
+@lru_cache(maxsize=None)
+def transpiled_consensus_circuit(backend, n_encoded):
+    """Transpile the voting circuit once per (backend, proposal length)."""
+    pm = generate_preset_pass_manager(backend=backend, optimization_level=1)
+    return pm.run(create_consensus_circuit(n_encoded))
+
 def run_vote(backend, seed_message):
     """Run voting circuit on one backend."""
-    qc = create_consensus_circuit(seed_message)
-
-    pm = generate_preset_pass_manager(backend=backend, optimization_level=1)
-    transpiled = pm.run(qc)
+    seed = seed_message[:5]
+    template = transpiled_consensus_circuit(backend, len(seed))
+    # Half-range light angles, bound by the sampler as a (circuit, values) PUB
+    values = [THETA_LIGHT[char_to_idx(char)] / 2 for char in seed]
 
     sampler = SamplerV2(backend)
-    job = sampler.run([transpiled], shots=1000)
+    job = sampler.run([(template, values)], shots=1000)
 
     result = job.result()
-    counts = result[0].data.c.get_counts()
+    # Integer-keyed counts straight from the BitArray, so no bitstring parsing
+    counts = result[0].data.c.get_int_counts()
 
     # Determine the "vote" (most common outcome)
-    vote = max(counts.items(), key=lambda x: x[1])[0]
-    vote_int = int(vote, 2)
+    vote_int = max(counts, key=counts.get)
     vote_wavelength = 400 + (vote_int / 31) * 300
     vote_char = wavelength_to_char(vote_wavelength)
 
-    # Calculate entropy (measure of agreement)
+    # Dense distribution over all 32 outcomes, indexed by outcome value
     total = sum(counts.values())
-    probs = [c/total for c in counts.values()]
-    entropy = -sum(p * np.log2(p) if p > 0 else 0 for p in probs)
+    dist = np.zeros(32)
+    dist[np.fromiter(counts, dtype=np.int64, count=len(counts))] = \
+        np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    dist /= total
+
+    # Calculate entropy (measure of agreement)
+    entropy = -(dist * np.log2(dist, where=dist > 0, out=np.zeros_like(dist))).sum()
 
     return {
         'backend': backend.name,
         'job_id': job.job_id(),
-        'vote': vote,
+        'vote': format(vote_int, '05b'),
         'vote_char': vote_char,
         'vote_wavelength': vote_wavelength,
         'entropy': entropy,
         'counts': counts,
-        'top_3': sorted(counts.items(), key=lambda x: -x[1])[:3]
+        'total': total,
+        'dist': dist,
+        'top_3': heapq.nlargest(3, counts.items(), key=itemgetter(1))
     }
 
 def calculate_consensus(results):
@@ -113,23 +121,21 @@ def calculate_consensus(results):
     # Check for character consensus
     char_consensus = len(set(vote_chars)) == 1
 
-    # Calculate cross-correlation of probability distributions
-    all_keys = set()
-    for r in results:
-        all_keys.update(r['counts'].keys())
-
-    # Build probability vectors
-    prob_vectors = []
-    for r in results:
-        total = sum(r['counts'].values())
-        vec = [r['counts'].get(k, 0) / total for k in sorted(all_keys)]
-        prob_vectors.append(vec)
-
-    # Pairwise correlations
+    # Calculate cross-correlation of probability distributions: stack the
+    # dense distributions, keeping only outcomes at least one computer saw
+    dists = np.vstack([r['dist'] for r in results])
+    seen = dists.any(axis=0)
+    prob_vectors = dists[:, seen]
+
+    # Pairwise Pearson correlations. Centre and take norms once per row,
+    # so each pair is a single dot product (np.corrcoef would build a full
+    # covariance matrix per pair)
+    centred = prob_vectors - prob_vectors.mean(axis=1, keepdims=True)
+    norms = np.sqrt(np.einsum('ij,ij->i', centred, centred))
     correlations = []
     for i in range(len(results)):
         for j in range(i + 1, len(results)):
-            corr = np.corrcoef(prob_vectors[i], prob_vectors[j])[0, 1]
+            corr = (centred[i] @ centred[j]) / (norms[i] * norms[j])
             correlations.append({
                 'pair': (results[i]['backend'], results[j]['backend']),
                 'correlation': corr
@@ -138,9 +144,7 @@ def calculate_consensus(results):
     avg_correlation = np.mean([c['correlation'] for c in correlations])
 
     # Find common outcomes across all computers
-    common_outcomes = set(results[0]['counts'].keys())
-    for r in results[1:]:
-        common_outcomes &= set(r['counts'].keys())
+    common_outcomes = np.count_nonzero(dists.all(axis=0))
 
     return {
         'unanimous': unanimous,
@@ -148,8 +152,8 @@ def calculate_consensus(results):
         'majority_vote': max(set(vote_chars), key=vote_chars.count),
         'correlations': correlations,
         'avg_correlation': avg_correlation,
-        'common_outcomes': len(common_outcomes),
-        'total_outcomes': len(all_keys)
+        'common_outcomes': common_outcomes,
+        'total_outcomes': np.count_nonzero(seen)
     }
 
 # =============================================================================
@@ -241,13 +245,12 @@ print(f"{'='*70}")
 
 for r in sorted(results, key=lambda x: x['backend']):
     print(f"\n{r['backend']}:")
-    for outcome, count in r['top_3']:
-        value = int(outcome, 2)
+    for value, count in r['top_3']:
         wl = 400 + (value / 31) * 300
         char = wavelength_to_char(wl)
-        pct = 100 * count / sum(r['counts'].values())
+        pct = 100 * count / r['total']
         bar = "█" * int(pct / 5)
-        print(f"  {outcome} → '{char}' ({wl:.0f}nm): {bar} {pct:.1f}%")
+        print(f"  {value:05b} → '{char}' ({wl:.0f}nm): {bar} {pct:.1f}%")
 
 # Visual voting
 print(f"\n{'='*70}")
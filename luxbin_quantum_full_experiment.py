@@ -20,13 +20,27 @@ IBM transmon qubits physically operate at 4-8 GHz, so the microwave
 channel directly corresponds to the hardware's native control pulses.
 """
 
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
 from qiskit_aer import AerSimulator
 from qiskit_aer.noise import NoiseModel
-import concurrent.futures
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+import heapq
 import numpy as np
 import time
 
+from luxbin_circuits import echo_tail, relay_tail, consensus_tail, ping_tail
+from luxbin_encoding import (
+    CHAR_WAVELENGTHS, CHAR_MICROWAVES, MW_MIN, MW_MAX, MW_EDGES,
+    WL_LUT, FREQ_LUT, MW_LUT, ascii_codes,
+    THETA_LIGHT, THETA_SOUND, THETA_MW, PING_THETA, PING_PHI, PING_GAMMA,
+    char_to_idx, wavelength_to_char, frequency_to_char, microwave_to_char,
+    color_name, note_name, decode_counts, SPACES, VERBOSE,
+)
+
 try:
     from qiskit_ibm_runtime.fake_provider import FakeManilaV2
     noise_model = NoiseModel.from_backend(FakeManilaV2())
@@ -36,265 +50,163 @@ except Exception:
     simulator = AerSimulator()
     print("Using ideal simulator")
 
+# Built once against the simulator target; transpile() would rebuild it
+# (and re-read the target) for every new template shape. Aer only needs
+# basis translation for the noise model's gate set, so no optimization.
+pass_manager = generate_preset_pass_manager(optimization_level=0, backend=simulator)
+
 # ==========================================================================
 # LUXBIN TRIPLE ENCODING: Light + Sound + Microwave
 # ==========================================================================
 
-# Light channel: visible spectrum (400-700nm) -> RY rotation
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
-
-# Sound channel: audible frequencies (262-2349 Hz) -> RZ rotation
-CHAR_FREQUENCIES = {
-    'A': 440.0, 'B': 493.9, 'C': 523.3, 'D': 587.3, 'E': 659.3,
-    'F': 698.5, 'G': 784.0, 'H': 830.6, 'I': 880.0, 'J': 932.3,
-    'K': 987.8, 'L': 1046.5, 'M': 1108.7, 'N': 1174.7, 'O': 1244.5,
-    'P': 1318.5, 'Q': 1396.9, 'R': 1480.0, 'S': 1568.0, 'T': 1661.2,
-    'U': 1760.0, 'V': 1864.7, 'W': 1975.5, 'X': 2093.0, 'Y': 2217.5,
-    'Z': 2349.3, ' ': 262.6,
-}
-
-# Microwave channel: transmon qubit frequencies (4.0-8.0 GHz) -> RX rotation
-# Maps to actual IBM superconducting qubit drive frequencies
-CHAR_MICROWAVES = {
-    'A': 4.000, 'B': 4.154, 'C': 4.308, 'D': 4.462, 'E': 4.615,
-    'F': 4.769, 'G': 4.923, 'H': 5.077, 'I': 5.231, 'J': 5.385,
-    'K': 5.538, 'L': 5.692, 'M': 5.846, 'N': 6.000, 'O': 6.154,
-    'P': 6.308, 'Q': 6.462, 'R': 6.615, 'S': 6.769, 'T': 6.923,
-    'U': 7.077, 'V': 7.231, 'W': 7.385, 'X': 7.538, 'Y': 7.692,
-    'Z': 7.846, ' ': 5.500,
-}
-
-MW_MIN = 4.0
-MW_MAX = 8.0
-
-
-def wavelength_to_char(wl):
-    return min(CHAR_WAVELENGTHS.items(), key=lambda x: abs(x[1] - wl))[0]
-
-
-def frequency_to_char(freq):
-    return min(CHAR_FREQUENCIES.items(), key=lambda x: abs(x[1] - freq))[0]
-
-
-def microwave_to_char(mw):
-    return min(CHAR_MICROWAVES.items(), key=lambda x: abs(x[1] - mw))[0]
-
-
-def color_name(wl):
-    if wl < 440: return "Violet"
-    if wl < 490: return "Blue"
-    if wl < 510: return "Cyan"
-    if wl < 565: return "Green"
-    if wl < 590: return "Yellow"
-    if wl < 625: return "Orange"
-    return "Red"
-
-
-def note_name(freq):
-    if freq < 300: return "C4"
-    if freq < 500: return "A4-B4"
-    if freq < 700: return "D5-E5"
-    if freq < 1000: return "G5-B5"
-    if freq < 1500: return "C6-F6"
-    if freq < 2000: return "G6-B6"
-    return "C7+"
+# Character tables, angle arrays, lookups and decode_counts live in
+# luxbin_encoding.py; only the simulator-side U-gate tables are built here.
+
+def _euler_from_angles(theta_y, theta_z, theta_x):
+    """U gate angles (theta, phi, lam) for RY(theta_y) -> RZ(theta_z) -> RX(theta_x),
+    equal up to global phase."""
+    cy, sy = np.cos(theta_y / 2), np.sin(theta_y / 2)
+    cx, sx = np.cos(theta_x / 2), np.sin(theta_x / 2)
+    ry = np.array([[cy, -sy], [sy, cy]])
+    rz = np.diag([np.exp(-0.5j * theta_z), np.exp(0.5j * theta_z)])
+    rx = np.array([[cx, -1j * sx], [-1j * sx, cx]])
+    mat = rx @ rz @ ry  # SU(2), so U's phases read straight off the bottom row
+    theta = 2 * np.arctan2(abs(mat[1, 0]), abs(mat[0, 0]))
+    phi_plus_lam = 2 * np.angle(mat[1, 1])
+    phi_minus_lam = 2 * np.angle(mat[1, 0])
+    return theta, (phi_plus_lam + phi_minus_lam) / 2, (phi_plus_lam - phi_minus_lam) / 2
+
+
+# Each character's three channel rotations pre-composed into one U gate, so
+# the transpiler sees one single-qubit gate per qubit instead of three.
+# Ping flips the sound angle; pong flips light and microwave.
+CHAR_U = np.array([_euler_from_angles(*a) for a in zip(THETA_LIGHT, THETA_SOUND, THETA_MW)])
+PING_U = np.array([_euler_from_angles(*a) for a in zip(PING_THETA, -PING_PHI, PING_GAMMA)])
+PONG_U = np.array([_euler_from_angles(*a) for a in zip(-PING_THETA, PING_PHI, -PING_GAMMA)])
+
+
+# Spelled-out band labels for this script's round breakdowns
+MW_BAND_NAMES = ["C-band", "C/X-trans", "X-band lo", "X-band hi"]
 
 
 def mw_band(ghz):
-    if ghz < 5.0: return "C-band"
-    if ghz < 6.0: return "C/X-trans"
-    if ghz < 7.0: return "X-band lo"
-    return "X-band hi"
-
-
-def decode_counts(counts, n_chars=5):
-    """Decode quantum measurement into LUXBIN message using triple encoding."""
-    sorted_counts = sorted(counts.items(), key=lambda x: -x[1])
-    chars = []
-    light_wls = []
-    sound_freqs = []
-    mw_ghzs = []
-
-    for bitstring, count in sorted_counts[:n_chars]:
-        value = int(bitstring, 2)
-        max_val = 2 ** len(bitstring) - 1
-        ratio = value / max_val if max_val > 0 else 0.5
-
-        # Light channel
-        wl = 400 + ratio * 300
-        char_light = wavelength_to_char(wl)
-
-        # Sound channel
-        freq = 262.6 + ratio * (2349.3 - 262.6)
-        char_sound = frequency_to_char(freq)
-
-        # Microwave channel
-        mw = MW_MIN + ratio * (MW_MAX - MW_MIN)
-        char_mw = microwave_to_char(mw)
-
-        # Triple-channel consensus: majority vote across channels
-        channel_votes = [char_light, char_sound, char_mw]
-        # If 2+ channels agree, use that; otherwise light priority
-        from collections import Counter
-        vote_counts = Counter(channel_votes)
-        winner = vote_counts.most_common(1)[0]
-        if winner[1] >= 2:
-            chars.append(winner[0])
-        else:
-            chars.append(char_light)
-
-        light_wls.append(wl)
-        sound_freqs.append(freq)
-        mw_ghzs.append(mw)
-
-    return ''.join(chars), light_wls, sound_freqs, mw_ghzs
+    return MW_BAND_NAMES[bisect_right(MW_EDGES, ghz)]
+
+
+PILOT_SHOTS = 100
+
+
+def is_settled(counts):
+    """True when the top outcome leads the runner-up by more than 3 sigma,
+    so more shots are very unlikely to change the winner."""
+    top1, top2 = (heapq.nlargest(2, counts.values()) + [0, 0])[:2]
+    return top1 - top2 > 3 * np.sqrt(top1)
 
 
 def run_circuit(qc, shots=500):
-    """Run circuit on Aer simulator."""
-    transpiled = transpile(qc, simulator)
-    job = simulator.run(transpiled, shots=shots)
-    result = job.result()
-    counts = result.get_counts()
-    return counts
+    """Run an already transpiled and bound circuit on Aer simulator."""
+    return run_circuits([qc], shots)[0]
+
+
+def run_circuits(circuits, shots=500, pilot=False):
+    """Run independent circuits as one Aer job (a single call into the simulator).
+
+    Counts are keyed by integer outcome. With pilot=True, for callers that
+    only read the winning outcome, a PILOT_SHOTS run goes first and just
+    the circuits whose winner is not yet settled get the remaining shots.
+    Message decodes rank the top five of up to 32 outcomes, which 100 shots
+    almost never separate, so they skip the pilot.
+    """
+    first = min(PILOT_SHOTS, shots) if pilot else shots
+    result = simulator.run(circuits, shots=first).result()
+    counts = [Counter(result.get_counts(i).int_outcomes()) for i in range(len(circuits))]
+
+    pending = [i for i, c in enumerate(counts) if not is_settled(c)]
+    if pending and shots > first:
+        result = simulator.run([circuits[i] for i in pending], shots=shots - first).result()
+        for j, i in enumerate(pending):
+            counts[i].update(result.get_counts(j).int_outcomes())
+    return [dict(c) for c in counts]
 
 
 # ==========================================================================
 # CIRCUIT BUILDERS (triple encoding: Light RY + Sound RZ + Microwave RX)
 # ==========================================================================
 
-def encode_char(qc, i, char):
+# Builders produce parameterized templates: only the rotation angles depend
+# on the message, so each (builder, n, variant) shape is transpiled once and
+# every run just binds that message's angles. All templates share one
+# module-level vector, U angles (theta, phi, lam) of qubit i at 3i..3i+2.
+ANGLES = ParameterVector('θ', 15)
+
+def encode_char(qc, i, theta, phi, lam):
     """Encode a character on qubit i using all 3 LUXBIN channels.
     Light  -> RY (amplitude axis)
     Sound  -> RZ (phase axis)
     Microwave -> RX (third axis)
-    Full Bloch sphere coverage!
+    Full Bloch sphere coverage! The three rotations arrive pre-composed
+    as the Euler angles of a single U gate (see CHAR_U).
     """
-    wl = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-    freq = CHAR_FREQUENCIES.get(char.upper(), 262.6)
-    mw = CHAR_MICROWAVES.get(char.upper(), 5.5)
+    qc.u(theta, phi, lam, i)
+
 
-    theta_light = ((wl - 400) / 300) * 2 * np.pi
-    theta_sound = ((freq - 262.6) / (2349.3 - 262.6)) * np.pi
-    theta_mw = ((mw - MW_MIN) / (MW_MAX - MW_MIN)) * np.pi
+def u_angles(message, n=5):
+    """U gate angles for the first n characters, flattened."""
+    return CHAR_U[[char_to_idx(c) for c in message[:n]]].ravel()
 
-    qc.ry(theta_light, i)   # Light: amplitude
-    qc.rz(theta_sound, i)   # Sound: phase
-    qc.rx(theta_mw, i)      # Microwave: third axis
 
+def ping_u_angles(message, is_pong=False, n=5):
+    """U gate angles for a ping (or pong) of the first n characters, flattened."""
+    return (PONG_U if is_pong else PING_U)[[char_to_idx(c) for c in message[:n]]].ravel()
 
-def build_echo_circuit(message):
-    n = min(len(message), 5)
+
+def encoding_layer(n):
+    """H + parameterized U on each of n qubits."""
     qc = QuantumCircuit(n, n)
-    for i, char in enumerate(message[:n]):
-        qc.h(i)
-        encode_char(qc, i, char)
-    for i in range(n - 1):
-        qc.cx(i, i + 1)
-    # Echo response layer
     for i in range(n):
         qc.h(i)
-        qc.t(i)
-        qc.h(i)
-    for i in range(n - 1):
-        qc.cx(i, i + 1)
-    qc.measure(range(n), range(n))
+        encode_char(qc, i, *ANGLES[3 * i:3 * i + 3])
     return qc
 
 
-def build_relay_circuit(message, leg):
-    n = min(len(message), 5)
-    qc = QuantumCircuit(n, n)
-    for i, char in enumerate(message[:n]):
-        qc.h(i)
-        encode_char(qc, i, char)
-    if leg == 1:
-        # Phase shifts + pairwise entanglement
-        for i in range(n):
-            qc.rz(np.pi / 4, i)
-            qc.rx(np.pi / 6, i)  # Microwave kick
-        for i in range(0, n - 1, 2):
-            qc.cx(i, i + 1)
-    elif leg == 2:
-        # Swap + rotate + microwave flip
-        for i in range(n - 1):
-            qc.swap(i, i + 1)
-        for i in range(n):
-            qc.ry(np.pi / 3, i)
-            qc.rx(np.pi / 4, i)  # Microwave modulation
-    elif leg == 3:
-        # Loop entangle + interference + microwave resonance
-        for i in range(n - 1):
-            qc.cx(i, i + 1)
-        qc.cx(n - 1, 0)
-        for i in range(n):
-            qc.h(i)
-            qc.rx(np.pi / 3, i)  # Microwave resonance sweep
-    for i in range(n):
-        qc.h(i)
-    qc.measure(range(n), range(n))
+def build_echo_circuit(n):
+    qc = encoding_layer(n)
+    qc.compose(echo_tail(n), inplace=True, copy=False)
     return qc
 
 
-def build_consensus_circuit(message):
-    n = 5
-    msg = (message + 'AAAAA')[:5]
-    qc = QuantumCircuit(n, n)
-    for i, char in enumerate(msg):
-        qc.h(i)
-        encode_char(qc, i, char)
-    # GHZ-like entanglement
-    for i in range(n - 1):
-        qc.cx(i, i + 1)
-    # Agreement phase + microwave sync
-    for i in range(n):
-        qc.rz(np.pi / n, i)
-        qc.rx(np.pi / (n + 1), i)  # Microwave consensus sync
-    for i in range(n):
-        qc.h(i)
-    qc.measure(range(n), range(n))
+def build_relay_circuit(n, leg):
+    qc = encoding_layer(n)
+    qc.compose(relay_tail(n, leg), inplace=True, copy=False)
     return qc
 
 
-def build_ping_circuit(message, is_pong=False):
-    n = min(len(message), 5)
-    qc = QuantumCircuit(n, n)
-    for i, char in enumerate(message[:n]):
-        wl = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-        freq = CHAR_FREQUENCIES.get(char.upper(), 262.6)
-        mw = CHAR_MICROWAVES.get(char.upper(), 5.5)
-        theta = ((wl - 400) / 300) * np.pi
-        phi = ((freq - 262.6) / (2349.3 - 262.6)) * np.pi / 2
-        gamma = ((mw - MW_MIN) / (MW_MAX - MW_MIN)) * np.pi / 2
-        qc.h(i)
-        if is_pong:
-            qc.ry(-theta, i)
-            qc.rz(phi, i)
-            qc.rx(-gamma, i)  # Microwave reverse
-        else:
-            qc.ry(theta, i)
-            qc.rz(-phi, i)
-            qc.rx(gamma, i)   # Microwave forward
-    if is_pong:
-        for i in range(n - 1, 0, -1):
-            qc.cx(i, i - 1)
-    else:
-        for i in range(n - 1):
-            qc.cx(i, i + 1)
-    for i in range(n):
-        qc.t(i)
-        qc.h(i)
-    qc.measure(range(n), range(n))
+def build_consensus_circuit(n=5):
+    qc = encoding_layer(n)
+    qc.compose(consensus_tail(n), inplace=True, copy=False)
     return qc
 
 
+def build_ping_circuit(n, is_pong=False):
+    # Same U layout as encode_char; ping_u_angles supplies the signed
+    # rotations (microwave forward on ping, reverse on pong)
+    qc = encoding_layer(n)
+    qc.compose(ping_tail(n, is_pong), inplace=True, copy=False)
+    return qc
+
+
+@lru_cache(maxsize=None)
+def transpiled_template(builder, n, *variant):
+    """Build and transpile a template once per shape."""
+    return pass_manager.run(builder(n, *variant))
+
+
+def bind_circuit(builder, angles, *variant):
+    """Transpiled template for builder with this message's angles bound.
+    ANGLES elements sort by index, so the values bind positionally."""
+    return transpiled_template(builder, len(angles) // 3, *variant).assign_parameters(angles)
+
+
 # ==========================================================================
 # MAIN PIPELINE
 # ==========================================================================
@@ -323,16 +235,17 @@ print(f"Starting message: '{current}'")
 
 for r in range(2):
     start = time.time()
-    qc = build_echo_circuit(current)
+    qc = bind_circuit(build_echo_circuit, u_angles(current))
     counts = run_circuit(qc, shots=200)
-    response, wls, freqs, mws = decode_counts(counts)
+    response, wls, freqs, mws = decode_counts(counts, num_bits=qc.num_clbits)
     elapsed = time.time() - start
 
     print(f"\n  Round {r+1} [{COMPUTERS[0]}]:")
     print(f"    Sent:      '{current}'")
-    print(f"    Light:     {[f'{w:.0f}nm ({color_name(w)})' for w in wls[:len(current)]]}")
-    print(f"    Sound:     {[f'{f:.0f}Hz ({note_name(f)})' for f in freqs[:len(current)]]}")
-    print(f"    Microwave: {[f'{m:.2f}GHz ({mw_band(m)})' for m in mws[:len(current)]]}")
+    if VERBOSE:
+        print(f"    Light:     {[f'{w:.0f}nm ({color_name(w)})' for w in wls[:len(current)]]}")
+        print(f"    Sound:     {[f'{f:.0f}Hz ({note_name(f)})' for f in freqs[:len(current)]]}")
+        print(f"    Microwave: {[f'{m:.2f}GHz ({mw_band(m)})' for m in mws[:len(current)]]}")
     print(f"    Response:  '{response}' ({elapsed:.2f}s)")
 
     pipeline_log.append({'phase': 'ECHO', 'in': current, 'out': response,
@@ -353,9 +266,9 @@ print(f"Input from Echo: '{current}'")
 for leg in range(1, 4):
     node = COMPUTERS[leg - 1]
     start = time.time()
-    qc = build_relay_circuit(current, leg)
+    qc = bind_circuit(build_relay_circuit, u_angles(current), leg)
     counts = run_circuit(qc, shots=500)
-    response, wls, freqs, mws = decode_counts(counts)
+    response, wls, freqs, mws = decode_counts(counts, num_bits=qc.num_clbits)
     elapsed = time.time() - start
 
     transforms = {
@@ -365,11 +278,13 @@ for leg in range(1, 4):
     }
     print(f"\n  Leg {leg} [{node}] - {transforms[leg]}:")
     print(f"    In:  '{current}'")
-    print(f"         Light: {[f'{CHAR_WAVELENGTHS.get(c.upper(),540):.0f}nm' for c in current[:5]]}")
-    print(f"         MW:    {[f'{CHAR_MICROWAVES.get(c.upper(),5.5):.2f}GHz' for c in current[:5]]}")
+    if VERBOSE:
+        print(f"         Light: {[f'{CHAR_WAVELENGTHS.get(c.upper(),540):.0f}nm' for c in current[:5]]}")
+        print(f"         MW:    {[f'{CHAR_MICROWAVES.get(c.upper(),5.5):.2f}GHz' for c in current[:5]]}")
     print(f"    Out: '{response}'")
-    print(f"         Sound: {[f'{f:.0f}Hz' for f in freqs[:5]]}")
-    print(f"         MW:    {[f'{m:.2f}GHz' for m in mws[:5]]}")
+    if VERBOSE:
+        print(f"         Sound: {[f'{f:.0f}Hz' for f in freqs[:5]]}")
+        print(f"         MW:    {[f'{m:.2f}GHz' for m in mws[:5]]}")
     print(f"    Time: {elapsed:.2f}s")
 
     pipeline_log.append({'phase': 'RELAY', 'in': current, 'out': response,
@@ -391,11 +306,8 @@ votes = []
 start = time.time()
 
 
-def vote(node_idx, msg):
-    qc = build_consensus_circuit(msg)
-    counts = run_circuit(qc, shots=1000)
-    top = max(counts.items(), key=lambda x: x[1])[0]
-    val = int(top, 2)
+def vote(node_idx, counts):
+    val = max(counts, key=counts.get)
     ratio = val / 31
     wl = 400 + ratio * 300
     freq = 262.6 + ratio * (2349.3 - 262.6)
@@ -406,22 +318,26 @@ def vote(node_idx, msg):
         'vote_sound': frequency_to_char(freq),
         'vote_mw': microwave_to_char(mw),
         'wl': wl, 'freq': freq, 'mw': mw,
-        'counts': counts
+        'counts': counts,
+        'total': sum(counts.values())
     }
 
 
-with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-    futures = [executor.submit(vote, i, current) for i in range(3)]
-    for f in concurrent.futures.as_completed(futures):
-        v = f.result()
-        votes.append(v)
-        channels = [v['vote_light'], v['vote_sound'], v['vote_mw']]
-        agreement = len(set(channels))
-        status = "3/3 AGREE" if agreement == 1 else f"2/3 AGREE" if agreement == 2 else "ALL DIFFER"
-        print(f"  {v['node']} votes: "
-              f"Light='{v['vote_light']}' ({v['wl']:.0f}nm) "
-              f"Sound='{v['vote_sound']}' ({v['freq']:.0f}Hz) "
-              f"MW='{v['vote_mw']}' ({v['mw']:.2f}GHz) [{status}]")
+# Every computer votes on the same proposal, so the ballot is bound once
+# and submitted three times in one batched Aer job; each copy is sampled
+# independently, and its shot count shows whether it stopped at the pilot
+ballot = bind_circuit(build_consensus_circuit, u_angles((current + 'AAAAA')[:5]))
+for i, counts in enumerate(run_circuits([ballot] * 3, shots=1000, pilot=True)):
+    v = vote(i, counts)
+    votes.append(v)
+    channels = [v['vote_light'], v['vote_sound'], v['vote_mw']]
+    agreement = len(set(channels))
+    status = "3/3 AGREE" if agreement == 1 else f"2/3 AGREE" if agreement == 2 else "ALL DIFFER"
+    print(f"  {v['node']} votes: "
+          f"Light='{v['vote_light']}' ({v['wl']:.0f}nm) "
+          f"Sound='{v['vote_sound']}' ({v['freq']:.0f}Hz) "
+          f"MW='{v['vote_mw']}' ({v['mw']:.2f}GHz) [{status}] "
+          f"({v['total']} shots)")
 
 elapsed = time.time() - start
 print(f"  Voting done in {elapsed:.2f}s")
@@ -454,17 +370,18 @@ for rally in range(4):
     action = "PONG" if is_pong else "PING"
 
     start = time.time()
-    qc = build_ping_circuit(current, is_pong)
+    qc = bind_circuit(build_ping_circuit, ping_u_angles(current, is_pong), is_pong)
     counts = run_circuit(qc, shots=500)
-    response, wls, freqs, mws = decode_counts(counts)
+    response, wls, freqs, mws = decode_counts(counts, num_bits=qc.num_clbits)
     elapsed = time.time() - start
 
     print(f"\n  Rally {rally+1} [{node}] {action}:")
     print(f"    Ball in:  '{current}'")
     print(f"    Ball out: '{response}' ({elapsed:.2f}s)")
-    print(f"    Light: {[f'{w:.0f}nm' for w in wls[:5]]}")
-    print(f"    Sound: {[f'{f:.0f}Hz' for f in freqs[:5]]}")
-    print(f"    MW:    {[f'{m:.2f}GHz' for m in mws[:5]]}")
+    if VERBOSE:
+        print(f"    Light: {[f'{w:.0f}nm' for w in wls[:5]]}")
+        print(f"    Sound: {[f'{f:.0f}Hz' for f in freqs[:5]]}")
+        print(f"    MW:    {[f'{m:.2f}GHz' for m in mws[:5]]}")
 
     pipeline_log.append({'phase': 'PINGPONG', 'in': current, 'out': response,
                          'node': node, 'time': elapsed})
@@ -481,9 +398,9 @@ print(f"PHASE 5: FINAL ECHO (loop back to start)")
 print(f"{'='*70}")
 
 start = time.time()
-qc = build_echo_circuit(current)
+qc = bind_circuit(build_echo_circuit, u_angles(current))
 counts = run_circuit(qc, shots=200)
-final, final_wls, final_freqs, final_mws = decode_counts(counts)
+final, final_wls, final_freqs, final_mws = decode_counts(counts, num_bits=qc.num_clbits)
 elapsed = time.time() - start
 
 pipeline_log.append({'phase': 'ECHO_FINAL', 'in': current, 'out': final,
@@ -504,27 +421,31 @@ print(f"{'='*70}")
 print(f"\nTotal time: {total_time:.2f}s")
 print(f"Total quantum operations: {len(pipeline_log)}")
 
-stages = [
-    ('START', '-', 'NICHO'),
-    ('ECHO', COMPUTERS[0], echo_out),
-    ('RELAY', 'All 3', relay_out),
-    ('CONSENSUS', 'All 3', consensus_out),
-    ('PINGPONG', f'{COMPUTERS[0]}/{COMPUTERS[1]}', pingpong_out),
-    ('FINAL', COMPUTERS[0], final),
-]
-
-print(f"\nMessage evolution (triple channel):")
-print("-" * 80)
-print(f"  {'Phase':<12} {'Node':<15} {'Message':<8} {'Light':<10} {'Sound':<10} {'Microwave'}")
-print("-" * 80)
-
-for label, node, msg in stages:
-    avg_wl = np.mean([CHAR_WAVELENGTHS.get(c.upper(), 540) for c in msg[:5]])
-    avg_fq = np.mean([CHAR_FREQUENCIES.get(c.upper(), 262.6) for c in msg[:5]])
-    avg_mw = np.mean([CHAR_MICROWAVES.get(c.upper(), 5.5) for c in msg[:5]])
-    print(f"  {label:<12} {node:<15} '{msg:<5}' {avg_wl:>6.0f}nm  {avg_fq:>7.0f}Hz  {avg_mw:>5.2f}GHz")
-
-print(f"""
+# Stage table, pipeline art and spectra; skipped when LUXBIN_VERBOSE=0
+if VERBOSE:
+    stages = [
+        ('START', '-', 'NICHO'),
+        ('ECHO', COMPUTERS[0], echo_out),
+        ('RELAY', 'All 3', relay_out),
+        ('CONSENSUS', 'All 3', consensus_out),
+        ('PINGPONG', f'{COMPUTERS[0]}/{COMPUTERS[1]}', pingpong_out),
+        ('FINAL', COMPUTERS[0], final),
+    ]
+
+    print(f"\nMessage evolution (triple channel):")
+    print("-" * 80)
+    print(f"  {'Phase':<12} {'Node':<15} {'Message':<8} {'Light':<10} {'Sound':<10} {'Microwave'}")
+    print("-" * 80)
+
+    # One gather per channel per stage, reused by the spectrum plots below
+    stage_means = []
+    for label, node, msg in stages:
+        codes = ascii_codes(msg)
+        avg_wl, avg_fq, avg_mw = WL_LUT[codes].mean(), FREQ_LUT[codes].mean(), MW_LUT[codes].mean()
+        stage_means.append((label, avg_wl, avg_fq, avg_mw))
+        print(f"  {label:<12} {node:<15} '{msg:<5}' {avg_wl:>6.0f}nm  {avg_fq:>7.0f}Hz  {avg_mw:>5.2f}GHz")
+
+    print(f"""
 {'='*70}
 PIPELINE VISUALIZATION (Triple-Channel LUXBIN)
 {'='*70}
@@ -572,41 +493,35 @@ PIPELINE VISUALIZATION (Triple-Channel LUXBIN)
     '{final}'
 """)
 
-# Spectrum visualizations
-print(f"{'='*70}")
-print("LIGHT SPECTRUM (RY axis)")
-print(f"{'='*70}")
-print("  400nm (Violet) ---------- 550nm (Green) ---------- 700nm (Red)")
-
-for label, _, msg in stages:
-    avg_wl = np.mean([CHAR_WAVELENGTHS.get(c.upper(), 540) for c in msg[:5]])
-    pos = int((avg_wl - 400) / 300 * 50)
-    bar = " " * pos + "●"
-    print(f"  {bar} {avg_wl:.0f}nm ({label})")
-
-print(f"\n{'='*70}")
-print("SOUND SPECTRUM (RZ axis)")
-print(f"{'='*70}")
-print("  262Hz (C4) ---------- 1300Hz (E6) ---------- 2349Hz (D7)")
-
-for label, _, msg in stages:
-    avg_fq = np.mean([CHAR_FREQUENCIES.get(c.upper(), 262.6) for c in msg[:5]])
-    pos = int((avg_fq - 262.6) / (2349.3 - 262.6) * 50)
-    bar = " " * pos + "●"
-    print(f"  {bar} {avg_fq:.0f}Hz ({label})")
-
-print(f"\n{'='*70}")
-print("MICROWAVE SPECTRUM (RX axis)")
-print(f"{'='*70}")
-print("  4.0GHz (C-band) -------- 6.0GHz (X-trans) -------- 8.0GHz (X-band)")
-
-for label, _, msg in stages:
-    avg_mw = np.mean([CHAR_MICROWAVES.get(c.upper(), 5.5) for c in msg[:5]])
-    pos = int((avg_mw - MW_MIN) / (MW_MAX - MW_MIN) * 50)
-    bar = " " * pos + "●"
-    print(f"  {bar} {avg_mw:.2f}GHz ({label})")
-
-print(f"""
+    # Spectrum visualizations: one pass over the stages fills all three plots
+    light_lines, sound_lines, mw_lines = [], [], []
+    for label, avg_wl, avg_fq, avg_mw in stage_means:
+        pos = int((avg_wl - 400) / 300 * 50)
+        light_lines.append(f"  {SPACES[min(pos, 63)]}● {avg_wl:.0f}nm ({label})")
+        pos = int((avg_fq - 262.6) / (2349.3 - 262.6) * 50)
+        sound_lines.append(f"  {SPACES[min(pos, 63)]}● {avg_fq:.0f}Hz ({label})")
+        pos = int((avg_mw - MW_MIN) / (MW_MAX - MW_MIN) * 50)
+        mw_lines.append(f"  {SPACES[min(pos, 63)]}● {avg_mw:.2f}GHz ({label})")
+
+    print(f"{'='*70}")
+    print("LIGHT SPECTRUM (RY axis)")
+    print(f"{'='*70}")
+    print("  400nm (Violet) ---------- 550nm (Green) ---------- 700nm (Red)")
+    print("\n".join(light_lines))
+
+    print(f"\n{'='*70}")
+    print("SOUND SPECTRUM (RZ axis)")
+    print(f"{'='*70}")
+    print("  262Hz (C4) ---------- 1300Hz (E6) ---------- 2349Hz (D7)")
+    print("\n".join(sound_lines))
+
+    print(f"\n{'='*70}")
+    print("MICROWAVE SPECTRUM (RX axis)")
+    print(f"{'='*70}")
+    print("  4.0GHz (C-band) -------- 6.0GHz (X-trans) -------- 8.0GHz (X-band)")
+    print("\n".join(mw_lines))
+
+    print(f"""
 {'='*70}
 BLOCH SPHERE ENCODING
 {'='*70}
@@ -22,17 +22,9 @@ import concurrent.futures
 import time
 import numpy as np
 
-TOKEN = "YOUR_IBM_QUANTUM_TOKEN"
+from luxbin_encoding import CHAR_WAVELENGTHS
 
-# LUXBIN mappings
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
+TOKEN = "YOUR_IBM_QUANTUM_TOKEN"
 
 WAVELENGTH_CHARS = {v: k for k, v in CHAR_WAVELENGTHS.items()}
 
@@ -10,52 +10,49 @@ Watch the message evolve through quantum back-and-forth!
 """
 
 from qiskit import QuantumCircuit
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2
-from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+from qiskit.circuit import ParameterVector
+from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2, Batch
+import concurrent.futures
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 import numpy as np
 import time
 import os
 
-TOKEN = os.environ.get('IBM_QUANTUM_TOKEN', 'YOUR_IBM_QUANTUM_TOKEN')
+from luxbin_hardware import get_pass_manager, SHOTS
+from luxbin_encoding import (CHAR_WAVELENGTHS, PING_THETA_LUT, BIT_TO_INT, ascii_codes,
+                             wavelength_to_char, SPACES, VERBOSE)
 
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
+TOKEN = os.environ.get('IBM_QUANTUM_TOKEN', 'YOUR_IBM_QUANTUM_TOKEN')
 
-def wavelength_to_char(wavelength):
-    closest = min(CHAR_WAVELENGTHS.items(), key=lambda x: abs(x[1] - wavelength))
-    return closest[0]
+# One angle per ball character; elements sort by index, so a message's
+# PING_THETA_LUT values bind positionally
+THETAS = ParameterVector('θ', 5)
 
-def create_ping_circuit(message, is_pong=False):
+def create_ping_circuit(n_qubits, is_pong=False):
     """
     Create ping or pong circuit.
 
     Ping: Forward encoding
     Pong: Reversed encoding (like reflecting)
+
+    The encoding angles are parameters, so each shape is transpiled once per
+    backend and bound per rally.
     """
-    n_qubits = min(len(message), 5)
     qc = QuantumCircuit(n_qubits, n_qubits)
 
-    # Encode message
-    for i, char in enumerate(message[:n_qubits]):
-        wavelength = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-        theta = ((wavelength - 400) / 300) * np.pi
-
-        qc.h(i)
+    # Encode message: H, RY, RZ fused into one U gate per qubit
+    # (RZ(φ)·RY(θ)·H = U(θ + π/2, φ, π) up to global phase)
+    for i in range(n_qubits):
+        theta = THETAS[i]
 
         if is_pong:
-            # Pong: Reverse direction
-            qc.ry(-theta, i)  # Negative rotation
-            qc.rz(theta, i)
+            # Pong: Reverse direction, RY(-θ) then RZ(θ)
+            qc.u(np.pi / 2 - theta, theta, np.pi, i)
         else:
-            # Ping: Forward direction
-            qc.ry(theta, i)
-            qc.rz(-theta, i)
+            # Ping: Forward direction, RY(θ) then RZ(-θ)
+            qc.u(theta + np.pi / 2, -theta, np.pi, i)
 
     # Entanglement pattern
     if is_pong:
@@ -77,13 +74,13 @@ def create_ping_circuit(message, is_pong=False):
 
 def decode_response(counts):
     """Decode measurement to message."""
-    sorted_counts = sorted(counts.items(), key=lambda x: -x[1])
+    top = heapq.nlargest(5, counts.items(), key=itemgetter(1))
 
     chars = []
     wavelengths = []
 
-    for bitstring, count in sorted_counts[:5]:
-        value = int(bitstring, 2)
+    for bitstring, count in top:
+        value = BIT_TO_INT[bitstring]
         max_val = 2 ** len(bitstring) - 1
         wl = 400 + (value / max_val) * 300 if max_val > 0 else 550
         char = wavelength_to_char(wl)
@@ -92,15 +89,19 @@ def decode_response(counts):
 
     return ''.join(chars), np.mean(wavelengths)
 
-def play_turn(backend, message, is_pong):
-    """Play one turn of ping-pong."""
-    qc = create_ping_circuit(message, is_pong)
+@lru_cache(maxsize=None)
+def transpiled_ping_circuit(backend, n_qubits, is_pong):
+    """Transpile the ping or pong circuit once per (backend, ball length),
+    onto luxbin_hardware's lowest-error qubit chain for the backend."""
+    return get_pass_manager(backend, n_qubits).run(create_ping_circuit(n_qubits, is_pong))
 
-    pm = generate_preset_pass_manager(backend=backend, optimization_level=1)
-    transpiled = pm.run(qc)
+def play_turn(backend, sampler, message, is_pong):
+    """Play one turn of ping-pong on the player's sampler."""
+    n_qubits = min(len(message), 5)
+    template = transpiled_ping_circuit(backend, n_qubits, is_pong)
+    values = PING_THETA_LUT[ascii_codes(message, n_qubits)]
 
-    sampler = SamplerV2(backend)
-    job = sampler.run([transpiled], shots=500)
+    job = sampler.run([(template, values)], shots=SHOTS)
 
     result = job.result()
     counts = result[0].data.c.get_counts()
@@ -149,33 +150,48 @@ print(f"{'='*70}")
 rally_log = []
 current_player = 0  # 0 = A, 1 = B
 
-for rally in range(num_rallies):
-    is_pong = (rally % 2 == 1)  # Alternate ping/pong
-    backend = player_a if current_player == 0 else player_b
-    player_name = "A" if current_player == 0 else "B"
+# Each player's rallies run in one batch instead of as stand-alone jobs
+with Batch(backend=player_a) as batch_a, Batch(backend=player_b) as batch_b, \
+        concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+    samplers = [SamplerV2(mode=batch_a), SamplerV2(mode=batch_b)]
+
+    # A always pings and B always pongs, so the game needs one template per
+    # player. Build both at once: B's transpile (and any backend metadata
+    # fetch) runs alongside A's and then behind A's first job. Returned balls
+    # are almost always 5 characters; a shorter one transpiles inline.
+    warmups = [executor.submit(transpiled_ping_circuit, player_a, 5, False),
+               executor.submit(transpiled_ping_circuit, player_b, 5, True)]
+
+    for rally in range(num_rallies):
+        is_pong = (rally % 2 == 1)  # Alternate ping/pong
+        backend = player_a if current_player == 0 else player_b
+        sampler = samplers[current_player]
+        player_name = "A" if current_player == 0 else "B"
+
+        print(f"\n{'─'*70}")
+        action = "PONG" if is_pong else "PING"
+        print(f"RALLY {rally + 1}: Player {player_name} ({backend.name}) - {action}")
+        print(f"{'─'*70}")
 
-    print(f"\n{'─'*70}")
-    action = "PONG" if is_pong else "PING"
-    print(f"RALLY {rally + 1}: Player {player_name} ({backend.name}) - {action}")
-    print(f"{'─'*70}")
+        print(f"🏓 Ball incoming: '{ball}'")
 
-    print(f"🏓 Ball incoming: '{ball}'")
+        warmups[current_player].result()
 
-    start = time.time()
-    result = play_turn(backend, ball, is_pong)
-    elapsed = time.time() - start
+        start = time.time()
+        result = play_turn(backend, sampler, ball, is_pong)
+        elapsed = time.time() - start
 
-    print(f"🏓 Ball returned: '{result['received']}' ({elapsed:.1f}s)")
-    print(f"   Wavelength: {result['wavelength']:.1f}nm")
-    print(f"   Job: {result['job_id']}")
+        print(f"🏓 Ball returned: '{result['received']}' ({elapsed:.1f}s)")
+        print(f"   Wavelength: {result['wavelength']:.1f}nm")
+        print(f"   Job: {result['job_id']}")
 
-    rally_log.append(result)
+        rally_log.append(result)
 
-    # Ball becomes the response
-    ball = result['received']
+        # Ball becomes the response
+        ball = result['received']
 
-    # Switch player
-    current_player = 1 - current_player
+        # Switch player
+        current_player = 1 - current_player
 
 # =============================================================================
 # RESULTS
@@ -194,12 +210,14 @@ for i, r in enumerate(rally_log):
     arrow = "──▶" if r['type'] == 'PING' else "◀──"
     print(f"  {i+1}. Player {player} ({r['type']}): '{r['sent']}' {arrow} '{r['received']}'")
 
-# Visual game
-print(f"\n{'='*70}")
-print("VISUAL RALLY")
-print(f"{'='*70}")
+# Visualizations and analysis; skipped when LUXBIN_VERBOSE=0
+if VERBOSE:
+    # Visual game
+    print(f"\n{'='*70}")
+    print("VISUAL RALLY")
+    print(f"{'='*70}")
 
-print(f"""
+    print(f"""
          Player A                                    Player B
     ┌─────────────────┐                        ┌─────────────────┐
     │  {player_a.name:^13}  │                        │  {player_b.name:^13}  │
@@ -209,51 +227,55 @@ print(f"""
     └─────────────────┘                        └─────────────────┘
 """)
 
-print("Ball trajectory:")
-print()
+    print("Ball trajectory:")
+    print()
 
-original = "HELLO"
-trajectory = [original] + [r['received'] for r in rally_log]
+    original = "HELLO"
+    trajectory = [original] + [r['received'] for r in rally_log]
 
-for i, msg in enumerate(trajectory):
-    if i == 0:
-        side = "START"
-    elif i % 2 == 1:
-        side = f"A→B"
-    else:
-        side = f"B→A"
+    # Each hop steps six columns right; the rows go out in one write
+    indents = ["    " + "  " * (i * 3) for i in range(len(trajectory))]
+    lines = []
+    for i, msg in enumerate(trajectory):
+        if i == 0:
+            side = "START"
+        elif i % 2 == 1:
+            side = f"A→B"
+        else:
+            side = f"B→A"
 
-    spaces = "  " * (i * 3)
-    if i < len(trajectory) - 1:
-        print(f"    {spaces}'{msg}' ──╮")
-        print(f"    {spaces}        │ {side}")
-        print(f"    {spaces}        ╰──▶")
-    else:
-        print(f"    {spaces}'{msg}' (FINAL)")
+        spaces = indents[i]
+        if i < len(trajectory) - 1:
+            lines.append(f"{spaces}'{msg}' ──╮")
+            lines.append(f"{spaces}        │ {side}")
+            lines.append(f"{spaces}        ╰──▶")
+        else:
+            lines.append(f"{spaces}'{msg}' (FINAL)")
+    print("\n".join(lines))
 
-# Wavelength bounce
-print(f"\n{'='*70}")
-print("WAVELENGTH BOUNCE PATTERN")
-print(f"{'='*70}")
+    # Wavelength bounce
+    print(f"\n{'='*70}")
+    print("WAVELENGTH BOUNCE PATTERN")
+    print(f"{'='*70}")
 
-print("\n  400nm ────────────────────── 550nm ────────────────────── 700nm")
+    print("\n  400nm ────────────────────── 550nm ────────────────────── 700nm")
 
-wls = [CHAR_WAVELENGTHS.get(trajectory[0][0].upper(), 540)]
-wls.extend([r['wavelength'] for r in rally_log])
+    wls = [CHAR_WAVELENGTHS.get(trajectory[0][0].upper(), 540)]
+    wls.extend([r['wavelength'] for r in rally_log])
 
-for i, wl in enumerate(wls):
-    pos = int((wl - 400) / 300 * 55)
-    if i == 0:
-        label = "START"
-    elif i % 2 == 1:
-        label = f"A→B"
-    else:
-        label = f"B→A"
+    for i, wl in enumerate(wls):
+        pos = int((wl - 400) / 300 * 55)
+        if i == 0:
+            label = "START"
+        elif i % 2 == 1:
+            label = f"A→B"
+        else:
+            label = f"B→A"
 
-    bar = " " * pos + "●"
-    print(f"  {bar} {wl:.0f}nm ({label})")
+        bar = SPACES[min(pos, 63)] + "●"
+        print(f"  {bar} {wl:.0f}nm ({label})")
 
-print(f"""
+    print(f"""
 {'='*70}
 ANALYSIS
 {'='*70}
@@ -10,45 +10,68 @@ The final message shows the cumulative quantum evolution!
 """
 
 from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
 from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2
-from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+import concurrent.futures
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 import numpy as np
 import time
 import os
 
+from luxbin_hardware import get_pass_manager, SHOTS
+from luxbin_encoding import (CHAR_WAVELENGTHS, THETA_LIGHT_LUT, BIT_TO_INT, ascii_codes,
+                             WL_KEYS, WL_VALS, nearest_chars, SPACES, VERBOSE)
+
 TOKEN = os.environ.get('IBM_QUANTUM_TOKEN', 'YOUR_IBM_QUANTUM_TOKEN')
 
-# LUXBIN mappings
-CHAR_WAVELENGTHS = {
-    'A': 400.0, 'B': 403.9, 'C': 407.8, 'D': 411.7, 'E': 415.6,
-    'F': 419.5, 'G': 423.4, 'H': 427.3, 'I': 431.2, 'J': 435.1,
-    'K': 439.0, 'L': 442.9, 'M': 446.8, 'N': 450.6, 'O': 454.5,
-    'P': 458.4, 'Q': 462.3, 'R': 466.2, 'S': 470.1, 'T': 474.0,
-    'U': 477.9, 'V': 481.8, 'W': 485.7, 'X': 489.6, 'Y': 493.5,
-    'Z': 497.4, ' ': 540.3,
-}
-
-def wavelength_to_char(wavelength):
-    """Find closest character for a wavelength."""
-    closest = min(CHAR_WAVELENGTHS.items(), key=lambda x: abs(x[1] - wavelength))
-    return closest[0]
-
-def create_relay_circuit(message, leg_number):
+# Relay map printed after the race, filled in with a single format call
+RELAY_BANNER = """
+    ┌─────────────┐
+    │   START     │
+    │   "RELAY"   │
+    └──────┬──────┘
+           │
+           ▼
+    ┌─────────────┐     LEG 1
+    │  {leg1:^9}  │ ──────────▶ Phase shifts + Entanglement
+    └──────┬──────┘
+           │
+           ▼
+    ┌─────────────┐     LEG 2
+    │  {leg2:^9}  │ ──────────▶ Swap + Rotation
+    └──────┬──────┘
+           │
+           ▼
+    ┌─────────────┐     LEG 3
+    │  {leg3:^9}  │ ──────────▶ Full entanglement + Interference
+    └──────┬──────┘
+           │
+           ▼
+    ┌─────────────┐
+    │   FINISH    │
+    │   "{final}"   │
+    └─────────────┘
+"""
+
+# One angle per message character; elements sort by index, so a message's
+# THETA_LIGHT_LUT values bind positionally
+THETAS = ParameterVector('θ', 5)
+
+def create_relay_circuit(n_qubits, leg_number):
     """
     Create circuit for one leg of the relay.
 
-    Each leg adds its own quantum transformation based on leg number.
+    Each leg adds its own quantum transformation based on leg number. The
+    encoding angles are parameters, so each leg is transpiled once per
+    backend and bound per message.
     """
-    n_qubits = min(len(message), 5)
     qc = QuantumCircuit(n_qubits, n_qubits)
 
-    # Encode message
-    for i, char in enumerate(message[:n_qubits]):
-        wavelength = CHAR_WAVELENGTHS.get(char.upper(), 540.3)
-        theta = ((wavelength - 400) / 300) * 2 * np.pi
-
-        qc.h(i)
-        qc.ry(theta, i)
+    # Encode message: H then RY(θ), as one U(θ + π/2, 0, π) gate per qubit
+    for i in range(n_qubits):
+        qc.u(THETAS[i] + np.pi / 2, 0, np.pi, i)
 
     # Leg-specific transformation (each computer adds its signature)
     if leg_number == 1:
@@ -83,32 +106,38 @@ def create_relay_circuit(message, leg_number):
 
 def decode_relay_result(counts):
     """Decode quantum measurement to LUXBIN message."""
-    sorted_counts = sorted(counts.items(), key=lambda x: -x[1])
-
-    # Take top outcomes and convert to wavelengths
-    decoded_chars = []
-    for bitstring, count in sorted_counts[:5]:
-        value = int(bitstring, 2)
-        max_val = 2 ** len(bitstring) - 1
-        wavelength = 400 + (value / max_val) * 300 if max_val > 0 else 550
-        char = wavelength_to_char(wavelength)
-        decoded_chars.append((char, wavelength, count))
+    top = heapq.nlargest(5, counts.items(), key=itemgetter(1))
+    if not top:
+        return '', np.nan, []
+    bitstrings, shot_counts = zip(*top)
+
+    # All bitstrings share the register width, so the top outcomes convert
+    # to wavelengths and characters in one pass
+    values = np.array([BIT_TO_INT[b] for b in bitstrings], dtype=np.int64)
+    max_val = 2 ** len(bitstrings[0]) - 1
+    wavelengths = 400 + (values / max_val) * 300 if max_val > 0 else np.full(len(values), 550.0)
+    chars = nearest_chars(WL_KEYS, WL_VALS, wavelengths)
+    decoded_chars = list(zip(chars.tolist(), wavelengths.tolist(), shot_counts))
 
     # Build message from most common outcomes
-    message = ''.join([c[0] for c in decoded_chars])
-    avg_wavelength = np.mean([c[1] for c in decoded_chars])
+    message = ''.join(chars)
+    avg_wavelength = wavelengths.mean()
 
     return message, avg_wavelength, decoded_chars
 
-def run_relay_leg(backend, message, leg_number):
-    """Run one leg of the relay race."""
-    qc = create_relay_circuit(message, leg_number)
+@lru_cache(maxsize=None)
+def transpiled_relay_circuit(backend, n_qubits, leg_number):
+    """Transpile one leg's circuit once per (backend, message length),
+    onto luxbin_hardware's lowest-error qubit chain for the backend."""
+    return get_pass_manager(backend, n_qubits).run(create_relay_circuit(n_qubits, leg_number))
 
-    pm = generate_preset_pass_manager(backend=backend, optimization_level=1)
-    transpiled = pm.run(qc)
+def run_relay_leg(backend, sampler, message, leg_number):
+    """Run one leg of the relay race on the station's sampler."""
+    n_qubits = min(len(message), 5)
+    template = transpiled_relay_circuit(backend, n_qubits, leg_number)
+    values = THETA_LIGHT_LUT[ascii_codes(message, n_qubits)]
 
-    sampler = SamplerV2(backend)
-    job = sampler.run([transpiled], shots=500)
+    job = sampler.run([(template, values)], shots=SHOTS)
 
     result = job.result()
     counts = result[0].data.c.get_counts()
@@ -145,6 +174,9 @@ print(f"Relay stations: {[b.name for b in backends]}")
 current_message = "RELAY"
 print(f"\n🏁 STARTING MESSAGE: '{current_message}'")
 
+# Samplers are built before the race so no leg pays for its construction
+samplers = {b.name: SamplerV2(b) for b in backends}
+
 relay_log = []
 total_start = time.time()
 
@@ -152,29 +184,38 @@ print(f"\n{'='*70}")
 print("RELAY RACE IN PROGRESS")
 print(f"{'='*70}")
 
-for leg, backend in enumerate(backends, 1):
-    print(f"\n{'─'*70}")
-    print(f"LEG {leg}: {backend.name}")
-    print(f"{'─'*70}")
+prefetch = None
+with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+    for leg, backend in enumerate(backends, 1):
+        print(f"\n{'─'*70}")
+        print(f"LEG {leg}: {backend.name}")
+        print(f"{'─'*70}")
 
-    print(f"📤 Passing: '{current_message}'")
-    wavelengths = [CHAR_WAVELENGTHS.get(c.upper(), 540) for c in current_message[:5]]
-    print(f"   Wavelengths: {[f'{w:.0f}nm' for w in wavelengths]}")
+        print(f"📤 Passing: '{current_message}'")
+        wavelengths = [CHAR_WAVELENGTHS.get(c.upper(), 540) for c in current_message[:5]]
+        print(f"   Wavelengths: {[f'{w:.0f}nm' for w in wavelengths]}")
 
-    start = time.time()
-    result = run_relay_leg(backend, current_message, leg)
-    elapsed = time.time() - start
+        # Transpile the next station's template on the worker while this leg
+        # waits on hardware; relayed messages are almost always 5 characters
+        if prefetch is not None:
+            prefetch.result()
+        prefetch = (executor.submit(transpiled_relay_circuit, backends[leg], 5, leg + 1)
+                    if leg < len(backends) else None)
 
-    print(f"\n📥 Received: '{result['output']}' (in {elapsed:.1f}s)")
-    print(f"   Avg wavelength: {result['wavelength']:.1f}nm")
-    print(f"   Job: {result['job_id']}")
+        start = time.time()
+        result = run_relay_leg(backend, samplers[backend.name], current_message, leg)
+        elapsed = time.time() - start
 
-    print(f"\n   Top outcomes:")
-    for char, wl, count in result['decoded'][:3]:
-        print(f"     '{char}' ({wl:.0f}nm): {count} shots")
+        print(f"\n📥 Received: '{result['output']}' (in {elapsed:.1f}s)")
+        print(f"   Avg wavelength: {result['wavelength']:.1f}nm")
+        print(f"   Job: {result['job_id']}")
 
-    relay_log.append(result)
-    current_message = result['output']
+        print(f"\n   Top outcomes:")
+        for char, wl, count in result['decoded'][:3]:
+            print(f"     '{char}' ({wl:.0f}nm): {count} shots")
+
+        relay_log.append(result)
+        current_message = result['output']
 
 total_elapsed = time.time() - total_start
 
@@ -198,55 +239,32 @@ for r in relay_log:
 
 print(f"\n  FINAL:  '{current_message}'")
 
-# Visualize the relay
-print(f"\n{'='*70}")
-print("RELAY VISUALIZATION")
-print(f"{'='*70}")
+# Visualizations and explanation; skipped when LUXBIN_VERBOSE=0
+if VERBOSE:
+    # Visualize the relay
+    print(f"\n{'='*70}")
+    print("RELAY VISUALIZATION")
+    print(f"{'='*70}")
 
-print("""
-    ┌─────────────┐
-    │   START     │
-    │   "RELAY"   │
-    └──────┬──────┘
-           │
-           ▼
-    ┌─────────────┐     LEG 1
-    │  """ + f"{backends[0].name:^9}" + """  │ ──────────▶ Phase shifts + Entanglement
-    └──────┬──────┘
-           │
-           ▼
-    ┌─────────────┐     LEG 2
-    │  """ + f"{backends[1].name:^9}" + """  │ ──────────▶ Swap + Rotation
-    └──────┬──────┘
-           │
-           ▼
-    ┌─────────────┐     LEG 3
-    │  """ + f"{backends[2].name:^9}" + """  │ ──────────▶ Full entanglement + Interference
-    └──────┬──────┘
-           │
-           ▼
-    ┌─────────────┐
-    │   FINISH    │
-    │   \"""" + current_message[:5] + """\"   │
-    └─────────────┘
-""")
+    print(RELAY_BANNER.format(leg1=backends[0].name, leg2=backends[1].name,
+                              leg3=backends[2].name, final=current_message[:5]))
 
-# Wavelength evolution
-print(f"\n{'='*70}")
-print("WAVELENGTH EVOLUTION")
-print(f"{'='*70}")
+    # Wavelength evolution
+    print(f"\n{'='*70}")
+    print("WAVELENGTH EVOLUTION")
+    print(f"{'='*70}")
 
-print("\n  400nm ────────────── 550nm ────────────── 700nm")
-print("  Violet    Blue    Cyan   Green   Yellow  Orange  Red")
-print("  │                   │                      │")
+    print("\n  400nm ────────────── 550nm ────────────── 700nm")
+    print("  Violet    Blue    Cyan   Green   Yellow  Orange  Red")
+    print("  │                   │                      │")
 
-for r in relay_log:
-    wl = r['wavelength']
-    pos = int((wl - 400) / 300 * 50)
-    bar = " " * pos + "●"
-    print(f"  {bar} {wl:.0f}nm ({r['backend']})")
+    for r in relay_log:
+        wl = r['wavelength']
+        pos = int((wl - 400) / 300 * 50)
+        bar = SPACES[min(pos, 63)] + "●"
+        print(f"  {bar} {wl:.0f}nm ({r['backend']})")
 
-print(f"""
+    print(f"""
 {'='*70}
 WHAT HAPPENED:
 {'='*70}